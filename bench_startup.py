@@ -0,0 +1,101 @@
+"""Time-to-first-output of every bot.
+
+Starts each bot with a canned first turn and measures how long it takes from
+process start until the first action line comes back.
+
+    python bench_startup.py --runs 20
+    python bench_startup.py --records records/*.rec
+
+With --records the first turn of each recording replaces the canned one.
+"""
+import argparse
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from records import Recording
+from records import bot_command
+
+ROOT = Path(__file__).parent
+
+FIRST_TURNS = {
+    'coders_strike_back/bronze.py': [
+        '5089 4758 11505 6078 6550 0',
+        '4963 5750',
+    ],
+    'olymbits/silver.py': [
+        '0',
+        '4',
+        '0 0 0 0 0 0 0 0 0 0 0 0 0',
+        '0 0 0 0 0 0 0 0 0 0 0 0 0',
+        '0 0 0 0 0 0 0 0 0 0 0 0 0',
+        '.....#...#...#.....#....#..... 0 0 0 0 0 0 -1',
+        '9914113315261 0 0 0 0 0 0 -1',
+        'URDL 0 0 0 0 0 0 15',
+        'UUUDDLLLULDRLL 0 0 0 0 0 0 -1',
+    ],
+    'seabed_security/silver.py': [
+        '14',
+        *(f'{4 + i} {i % 4} {i // 4}' for i in range(12)),
+        '16 -1 -1',
+        '17 -1 -1',
+        '0', '0', '0', '0',
+        '2', '0 2000 500 0 30', '2 6000 500 0 30',
+        '2', '1 7999 500 0 30', '3 3999 500 0 30',
+        '0',
+        '0',
+        '0',
+    ],
+}
+
+
+def time_to_first_output(bot, lines):
+    """seconds from spawning the bot to reading its first line"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        bot_command(ROOT / bot),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        proc.stdin.write('\n'.join(lines) + '\n')
+        proc.stdin.flush()
+        if not proc.stdout.readline():
+            raise RuntimeError(f'{bot} exited without output')
+        return time.perf_counter() - start
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--records', nargs='*', default=[], help='recordings to take first turns from')
+    parser.add_argument('bots', nargs='*', default=list(FIRST_TURNS))
+    args = parser.parse_args(argv)
+
+    first_turns, bots = dict(FIRST_TURNS), args.bots
+    if args.records:
+        bots = []
+        for path in args.records:
+            with Recording(path) as rec:
+                first_turns[rec.bot] = next(iter(rec)).input
+                bots.append(rec.bot)
+        bots = list(dict.fromkeys(bots))
+
+    for bot in bots:
+        times = [time_to_first_output(bot, first_turns[bot]) * 1000 for _ in range(args.runs)]
+        print(
+            f'{bot:<28}'
+            f'| median: {statistics.median(times):7.1f}ms'
+            f'| min: {min(times):7.1f}ms'
+            f'| max: {max(times):7.1f}ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,7 @@
+import base64
 import collections
+import importlib
+import itertools
 import math
 import sys
 from dataclasses import dataclass
@@ -6,7 +9,20 @@ from dataclasses import field
 from functools import cached_property
 from functools import partial
 
-import numpy as np
+
+class LazyModule:
+    """module imported on first attribute access, keeps startup cheap"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        self.__dict__.update(vars(module))
+        return getattr(module, attr)
+
+
+np = LazyModule('numpy')
 
 log = partial(print, file=sys.stderr, flush=True)
 
@@ -20,18 +36,63 @@ class Params:
     BOOST_DIST = 2000
     BOOST_ANGLE = 3
 
+    LEAGUE = 'bronze'  # 'gold' reads the full two pods per side input
+    POLICY = 'rules'  # 'mlp' races with the embedded neural policy
+
+    SEARCH_DEPTH = 4  # turns each candidate move is held for
+    BLOCKER_WEIGHT = 0.5
+    FRIENDLY_BUMP_PENALTY = 5000
+    SHIELD_SPEED = 400  # relative speed worth shielding a hit at
+
+
+# ========== physics ==========
+
+MAX_ROTATION = 18  # degrees per turn
+FRICTION = 0.85
+POD_RADIUS = 400
+BOOST_THRUST = 650
+
+
+# ========== lookup tables ==========
+
+# sin / cos of every whole degree, filled in by precompute()
+SIN = []
+COS = []
+
+
+def precompute():
+    """build static tables, meant for the generous first turn"""
+    SIN[:] = (math.sin(math.radians(a)) for a in range(360))
+    COS[:] = (math.cos(math.radians(a)) for a in range(360))
+    if Params.POLICY == 'mlp':
+        POLICY.load()
+
 
 # ========== helper functions ==========
 
-def unit_vector(vector):
-    return vector / np.linalg.norm(vector)
+def bearing(src, dest):
+    """whole degrees from src towards dest, clockwise as y points down"""
+    return round(math.degrees(math.atan2(dest[1] - src[1], dest[0] - src[0]))) % 360
+
 
+def angle_between(facing, direction):
+    """signed degrees to turn from facing to direction, in [-180, 180)"""
+    return (direction - facing + 180) % 360 - 180
 
-def angle_between(v1, v2):
-    # TODO: we dont know our bearing.. cant calculate proper angle
-    v1_u = unit_vector(v1)
-    v2_u = unit_vector(v2)
-    return np.rad2deg(np.arccos(np.clip(np.dot(v1_u, v2_u), -1.0, 1.0)))
+
+def rotate(facing, direction):
+    """facing after one turn towards direction, clamped like the referee"""
+    turn = angle_between(facing, direction)
+    return (facing + max(-MAX_ROTATION, min(MAX_ROTATION, turn))) % 360
+
+
+def simulate(pos, velocity, facing, direction, thrust):
+    """one turn of pod movement, uses only the lookup tables"""
+    facing = rotate(facing, direction)
+    vx = velocity[0] + COS[facing] * thrust
+    vy = velocity[1] + SIN[facing] * thrust
+    pos = round(pos[0] + vx), round(pos[1] + vy)
+    return pos, (int(vx * FRICTION), int(vy * FRICTION)), facing
 
 
 # ========== base classes ==========
@@ -46,16 +107,18 @@ class State:
 
 @dataclass(kw_only=True)
 class Point:
-    pos: np.ndarray = field(default_factory=lambda: np.array([0, 0]))
+    pos: tuple[int, int] = (0, 0)
 
     def interpolate_percent(self, dest: 'Point', percent):
-        return ((1 - percent) * self.pos + percent * dest.pos).astype(int)
+        (x, y), (dx, dy) = self.pos, dest.pos
+        return int((1 - percent) * x + percent * dx), int((1 - percent) * y + percent * dy)
 
     def interpolate_units(self, dest: 'Point', amt: int):
-        direction = dest.pos - self.pos
-        direction_normalized = direction / np.linalg.norm(direction)
-        X = self.pos + direction_normalized * amt
-        return X.astype(int)
+        (x, y), (dx, dy) = self.pos, dest.pos
+        dist = math.hypot(dx - x, dy - y)
+        if not dist:
+            return self.pos  # no direction to move in
+        return int(x + (dx - x) / dist * amt), int(y + (dy - y) / dist * amt)
 
 
 # ========== reusable strategies ==========
@@ -90,7 +153,7 @@ def thrust_strategy(player: 'Player'):
         if (
                 not player.boost_used
                 and player.next_cp.distance > Params.BOOST_DIST
-                and player.next_cp.angle < Params.BOOST_ANGLE
+                and abs(player.angle_to(player.next_cp.aimpoint)) < Params.BOOST_ANGLE
 
         ):
             player.boost_used = True
@@ -98,8 +161,10 @@ def thrust_strategy(player: 'Player'):
         else:
             return None
 
+    # angle left to cover once this turn's rotation is done
+    aim = bearing(player.pos, player.next_cp.aimpoint)
     thrust = min(
-        by_angle(player.next_cp.angle),
+        by_angle(angle_between(rotate(player.facing, aim), aim)),
         by_distance(player.next_cp.distance),
     )
     boost = boost()
@@ -107,14 +172,111 @@ def thrust_strategy(player: 'Player'):
     return boost or int(thrust)
 
 
+def race_strategy(player: 'Player'):
+    """steer target and thrust for this turn"""
+    if Params.POLICY == 'mlp':
+        return policy_strategy(player)
+    return *steer_strategy(player), thrust_strategy(player)
+
+
+# ========== neural policy ==========
+
+# trained by train_policy.py, float16 weights of a features -> hidden -> 2 MLP
+POLICY_SHAPE = (5, 16, 2)
+POLICY_WEIGHTS = '/cJBsNFDh0M8w8Q0FkhZPBTIn8hoQDLAJ8levGnHb0HovUhAwz7kMK67BEBotla12j3WrvCwHTWIu2O4i7jTwUTAMrfYOB47pb4WQFm3cEfpHr+ynkBPLnguycHBK65BVEQJNUeocL4rQzG0Y8C2wb1AzUJiw8M9G0S7POE/p8NERdykgzyEQ0lCQ7xEOA+1dzFmPSA9FsX2PmVDwz7bRJm7MbgKOk+7ZSYmuoy50UIGuSM5QD34uwG8ITPKN+YwA74dwWs5CTn2wAE3NjotQh8sXEV8PJg9VL6MQmU9WUWewhA/rrsVyJ6mrUMGOa9Fj0I9QUi97qFpvXNFs78Muki8pjk='
+
+
+def features(pods, targets):
+    """one row per pod: distance, direction and velocity seen from the pod"""
+    rows = []
+    for pod, target in zip(pods, targets):
+        facing = pod.facing
+        angle = angle_between(facing, bearing(pod.pos, target)) % 360
+        vx, vy = pod.velocity
+        rows.append((
+            math.dist(pod.pos, target) / 10000,
+            SIN[angle],
+            COS[angle],
+            (vx * COS[facing] + vy * SIN[facing]) / 1000,
+            (vy * COS[facing] - vx * SIN[facing]) / 1000,
+        ))
+    return np.array(rows, dtype=np.float32)
+
+
+class Policy:
+    """small MLP mapping pod features to (turn, thrust), batched"""
+
+    def __init__(self, packed, shape):
+        self.packed = packed
+        self.shape = shape
+        self.layers = None
+
+    @staticmethod
+    def sizes(shape):
+        n_in, hidden, n_out = shape
+        return (n_in, hidden), (hidden,), (hidden, n_out), (n_out,)
+
+    @classmethod
+    def pack(cls, layers):
+        flat = np.concatenate([np.ravel(layer) for layer in layers]).astype('<f2')
+        return base64.b64encode(flat.tobytes()).decode()
+
+    def load(self):
+        flat = np.frombuffer(base64.b64decode(self.packed), dtype='<f2').astype(np.float32)
+        self.layers = []
+        for size in self.sizes(self.shape):
+            count = math.prod(size)
+            self.layers.append(flat[:count].reshape(size))
+            flat = flat[count:]
+
+    def __call__(self, x):
+        """turn offsets in degrees and thrusts for a batch of feature rows"""
+        if self.layers is None:
+            self.load()
+        w1, b1, w2, b2 = self.layers
+        z = np.tanh(x @ w1 + b1) @ w2 + b2
+        turn = np.tanh(z[:, 0]) * MAX_ROTATION
+        thrust = 100 / (1 + np.exp(-z[:, 1]))
+        return turn, thrust
+
+
+POLICY = Policy(POLICY_WEIGHTS, POLICY_SHAPE)
+
+
+def policy_strategy(player: 'Player'):
+    target = player.next_cp.pos
+    (turn,), (thrust,) = POLICY(features([player], [target]))
+    facing = (player.facing + round(turn)) % 360
+    x = round(player.pos[0] + COS[facing] * 1000)
+    y = round(player.pos[1] + SIN[facing] * 1000)
+    return x, y, int(thrust)
+
+
+def policy_rollout(pods, checkpoints, depth=Params.SEARCH_DEPTH):
+    """paths of a batch of race pods all driven by the policy"""
+    states = [[pod.pos, pod.velocity, pod.facing, pod.cp_id] for pod in pods]
+    paths = [[] for _ in pods]
+    for _ in range(depth):
+        views = [Pod(pos=pos, velocity=velocity, facing=facing) for pos, velocity, facing, _ in states]
+        targets = [checkpoints[cp_id].pos for *_, cp_id in states]
+        turns, thrusts = POLICY(features(views, targets))
+        for state, path, turn, thrust in zip(states, paths, turns, thrusts):
+            pos, velocity, facing, cp_id = state
+            pos, velocity, facing = simulate(pos, velocity, facing, (facing + round(turn)) % 360, thrust)
+            if math.dist(pos, checkpoints[cp_id].pos) < checkpoints[cp_id].radius:
+                cp_id = (cp_id + 1) % len(checkpoints)
+            state[:] = pos, velocity, facing, cp_id
+            path.append(pos)
+    return paths
+
+
 # ========== state ==========
 
 
 class FirstRound(State):
     def action(self, context):
-        steer = steer_strategy(context)
-        thrust = thrust_strategy(context)
-        print(*steer, thrust)
+        precompute()
+        print(*race_strategy(context))
 
     def next_state(self, context):
         # TODO: add proper transition after first round
@@ -123,9 +285,7 @@ class FirstRound(State):
 
 class Race(State):
     def action(self, context):
-        steer = steer_strategy(context)
-        thrust = thrust_strategy(context)
-        print(*steer, thrust)
+        print(*race_strategy(context))
 
     def next_state(self, context):
         return self
@@ -149,7 +309,7 @@ class StateMachine:
 
 # ========== game entities ==========
 
-ARENA_CENTER = Point(pos=np.array([8000, 4500]))
+ARENA_CENTER = Point(pos=(8000, 4500))
 
 
 @dataclass
@@ -163,9 +323,27 @@ class Checkpoint(Point):
         return self.interpolate_units(ARENA_CENTER, self.radius)
 
 
-@dataclass
+@dataclass(kw_only=True)
 class Pod(Point):
-    pass
+    velocity: tuple[int, int] = (0, 0)
+    facing: int | None = None
+    seen: bool = field(default=False, repr=False)  # tracked at least once, pos is a real reading
+
+    def track(self, pos, facing=None):
+        """move to a freshly read position, velocity and facing follow
+
+        without the referee's facing the direction of travel is used
+        """
+        if self.seen:
+            dx, dy = pos[0] - self.pos[0], pos[1] - self.pos[1]
+            self.velocity = int(dx * FRICTION), int(dy * FRICTION)
+            if facing is None and (dx or dy):
+                facing = bearing(self.pos, pos)
+        self.pos, self.seen = pos, True
+        self.facing = self.facing if facing is None else facing
+
+    def angle_to(self, point):
+        return angle_between(self.facing, bearing(self.pos, point))
 
 
 @dataclass
@@ -202,9 +380,9 @@ class Game:
         ) = map(int, input().split())
         opponent_x, opponent_y = map(int, input().split())
 
-        player_pos = np.array([x, y])
-        enemy_pos = np.array([opponent_x, opponent_y])
-        next_cp_pos = np.array([next_checkpoint_x, next_checkpoint_y])
+        player_pos = x, y
+        enemy_pos = opponent_x, opponent_y
+        next_cp_pos = next_checkpoint_x, next_checkpoint_y
         next_checkpoint = Checkpoint(
             pos=next_cp_pos,
             angle=next_checkpoint_angle,
@@ -221,13 +399,14 @@ class Game:
         player_pos, enemy_pos, next_checkpoint = self.read_state()
 
         # enemy
-        self.enemy.pos = enemy_pos
+        self.enemy.track(enemy_pos)
 
         # checkpoints
         self._add_checkpoint(next_checkpoint)
 
-        # player
-        self.player.pos = player_pos
+        # player, the checkpoint angle is measured from our facing
+        facing = (bearing(player_pos, next_checkpoint.pos) - next_checkpoint.angle) % 360
+        self.player.track(player_pos, facing)
         self.player.checkpoints = self.checkpoints
 
     def play(self):
@@ -236,6 +415,156 @@ class Game:
             self.player.state_machine.action()
 
 
+# ========== league mode ==========
+
+@dataclass(kw_only=True)
+class RacePod(Pod):
+    cp_id: int = 1
+    passed: int = 0
+    boost_used: bool = False
+
+    def update(self, pos, velocity, angle, cp_id, checkpoints):
+        if self.facing is not None and cp_id != self.cp_id:
+            self.passed += 1
+        self.pos, self.velocity, self.cp_id = pos, velocity, cp_id
+        # no facing before the first move, any direction can be taken then
+        self.facing = angle if angle >= 0 else bearing(pos, checkpoints[cp_id].pos)
+
+    def progress(self, checkpoints):
+        return self.passed * 100_000 - math.dist(self.pos, checkpoints[self.cp_id].pos)
+
+
+@dataclass
+class Rollout:
+    turn: int
+    thrust: int | str
+    path: list[tuple[int, int]]
+    progress: float
+
+
+def rollout(pod, turn, thrust, checkpoints, depth=Params.SEARCH_DEPTH):
+    """hold a turn and thrust for depth turns
+
+    turn is either an offset from the current facing, or None to keep
+    steering at the next checkpoint
+    """
+    pos, velocity, facing = pod.pos, pod.velocity, pod.facing
+    cp_id, passed = pod.cp_id, pod.passed
+    power = BOOST_THRUST if thrust == 'BOOST' else thrust
+
+    path = []
+    for _ in range(depth):
+        if turn is None:
+            direction = bearing(pos, checkpoints[cp_id].pos)  # the checkpoint changes on the way
+        else:
+            direction = (facing + turn) % 360
+        pos, velocity, facing = simulate(pos, velocity, facing, direction, power)
+        cp = checkpoints[cp_id]
+        if math.dist(pos, cp.pos) < cp.radius:
+            cp_id = (cp_id + 1) % len(checkpoints)
+            passed += 1
+        path.append(pos)
+        power = min(power, 100)
+
+    progress = passed * 100_000 - math.dist(pos, checkpoints[cp_id].pos)
+    return Rollout(turn, thrust, path, progress)
+
+
+def candidates(pod, checkpoints, boost=False):
+    moves = [
+        rollout(pod, turn, thrust, checkpoints)
+        for turn in (-MAX_ROTATION, -MAX_ROTATION // 2, 0, MAX_ROTATION // 2, MAX_ROTATION)
+        for thrust in (0, 60, 100)
+    ]
+    if boost and not pod.boost_used:
+        moves.append(rollout(pod, 0, 'BOOST', checkpoints))
+    return moves
+
+
+def plan_pair(runner, blocker, leader, checkpoints):
+    """best joint (runner, blocker) move from one shared search
+
+    every candidate trajectory is simulated once, pairs are only scored
+    """
+    if Params.POLICY == 'mlp':
+        leader_path, = policy_rollout([leader], checkpoints)
+    else:
+        leader_path = rollout(leader, None, 100, checkpoints).path
+    runner_moves = candidates(runner, checkpoints, boost=True)
+    blocker_moves = candidates(blocker, checkpoints)
+
+    blocking = {
+        id(b): min(math.dist(pos, enemy) for pos, enemy in zip(b.path, leader_path))
+        for b in blocker_moves
+    }
+
+    def value(pair):
+        r, b = pair
+        bump = any(math.dist(rp, bp) < 2 * POD_RADIUS for rp, bp in zip(r.path, b.path))
+        return (
+            r.progress
+            - Params.BLOCKER_WEIGHT * blocking[id(b)]
+            - Params.FRIENDLY_BUMP_PENALTY * bump
+        )
+
+    return max(itertools.product(runner_moves, blocker_moves), key=value)
+
+
+def command(pod, move, shield=False):
+    facing = (pod.facing + move.turn) % 360
+    x = round(pod.pos[0] + COS[facing] * 1000)
+    y = round(pod.pos[1] + SIN[facing] * 1000)
+    if move.thrust == 'BOOST':
+        pod.boost_used = True
+    return x, y, 'SHIELD' if shield else move.thrust
+
+
+class LeagueGame:
+    """Gold / Legend input, checkpoint list up front and two pods per side"""
+
+    def __init__(self):
+        self.laps = int(input())
+        checkpoint_count = int(input())
+        self.checkpoints = [
+            Checkpoint(pos=tuple(map(int, input().split())))
+            for _ in range(checkpoint_count)
+        ]
+        self.pods = [RacePod(), RacePod()]
+        self.enemies = [RacePod(), RacePod()]
+
+    @staticmethod
+    def read_pod():
+        x, y, vx, vy, angle, next_check_point_id = map(int, input().split())
+        return (x, y), (vx, vy), angle, next_check_point_id
+
+    def update_state(self):
+        for pod in self.pods + self.enemies:
+            pod.update(*self.read_pod(), self.checkpoints)
+
+    def act(self):
+        runner, blocker = sorted(self.pods, key=lambda p: p.progress(self.checkpoints), reverse=True)
+        leader = max(self.enemies, key=lambda p: p.progress(self.checkpoints))
+
+        runner_move, blocker_move = plan_pair(runner, blocker, leader, self.checkpoints)
+        leader_next = rollout(leader, None, 100, self.checkpoints, depth=1).path[0]
+        shield = (
+            math.dist(blocker_move.path[0], leader_next) < 2 * POD_RADIUS
+            and math.dist(blocker.velocity, leader.velocity) > Params.SHIELD_SPEED
+        )
+        orders = {
+            id(runner): command(runner, runner_move),
+            id(blocker): command(blocker, blocker_move, shield),
+        }
+        for pod in self.pods:
+            print(*orders[id(pod)])
+
+    def play(self):
+        precompute()
+        while True:
+            self.update_state()
+            self.act()
+
+
 class MockInput:
     def __init__(self, responses):
         self.responses = iter(responses)
@@ -246,5 +575,6 @@ class MockInput:
 
 # input = MockInput(['5089 4758 11505 6078 6550 0', '4963 5750'])
 
-g = Game()
-g.play()
+if __name__ == '__main__':
+    g = LeagueGame() if Params.LEAGUE == 'gold' else Game()
+    g.play()
@@ -0,0 +1,189 @@
+"""Offline trainer for the embedded pod policy of bronze.py.
+
+Imitates the search: on random tracks a pod is driven by the best held
+move from `candidates`, every visited state is labelled with that move and
+a small MLP is fitted to the labels with plain NumPy.
+
+    python coders_strike_back/train_policy.py --write
+
+`--write` replaces POLICY_WEIGHTS in bronze.py with the packed result.
+"""
+import argparse
+import math
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+import bronze
+from bronze import MAX_ROTATION
+from bronze import POLICY_SHAPE
+from bronze import Checkpoint
+from bronze import Policy
+from bronze import RacePod
+from bronze import bearing
+from bronze import candidates
+from bronze import features
+from bronze import simulate
+
+BOT = Path(bronze.__file__)
+WIDTH, HEIGHT = 16000, 9000
+
+
+def random_track(rng):
+    """3 to 6 checkpoints, kept apart like the referee does"""
+    points, count = [], rng.randint(3, 6)
+    while len(points) < count:
+        point = rng.randrange(1000, WIDTH - 1000), rng.randrange(1000, HEIGHT - 1000)
+        if all(math.dist(point, other) > 2500 for other in points):
+            points.append(point)
+    return [Checkpoint(pos=point) for point in points]
+
+
+def start_pod(checkpoints):
+    start = checkpoints[0].pos
+    pod = RacePod(pos=start, cp_id=1)
+    pod.facing = bearing(start, checkpoints[1].pos)
+    return pod
+
+
+def step(pod, turn, thrust, checkpoints):
+    pod.pos, pod.velocity, pod.facing = simulate(
+        pod.pos, pod.velocity, pod.facing, (pod.facing + round(turn)) % 360, thrust,
+    )
+    cp = checkpoints[pod.cp_id]
+    if math.dist(pod.pos, cp.pos) < cp.radius:
+        pod.cp_id = (pod.cp_id + 1) % len(checkpoints)
+        pod.passed += 1
+
+
+def teacher(pod, checkpoints):
+    move = max(candidates(pod, checkpoints), key=lambda m: m.progress)
+    return move.turn, move.thrust
+
+
+def collect(rng, episodes, turns, noise):
+    """(features, labels) visited by the teacher, with some steering noise"""
+    xs, ys = [], []
+    for _ in range(episodes):
+        checkpoints = random_track(rng)
+        pod = start_pod(checkpoints)
+        for _ in range(turns):
+            turn, thrust = teacher(pod, checkpoints)
+            xs.append(features([pod], [checkpoints[pod.cp_id].pos])[0])
+            ys.append((turn / MAX_ROTATION, thrust / 100))
+            if rng.random() < noise:
+                turn = rng.uniform(-MAX_ROTATION, MAX_ROTATION)
+            step(pod, turn, thrust, checkpoints)
+    return np.array(xs, dtype=np.float32), np.array(ys, dtype=np.float32)
+
+
+def forward(layers, x):
+    w1, b1, w2, b2 = layers
+    h = np.tanh(x @ w1 + b1)
+    z = h @ w2 + b2
+    out = np.stack([np.tanh(z[:, 0]), 1 / (1 + np.exp(-z[:, 1]))], axis=1)
+    return h, out
+
+
+def train(x, y, epochs, batch, lr, seed):
+    """fit the MLP with Adam on squared error of (turn, thrust)"""
+    rng = np.random.default_rng(seed)
+    layers = [
+        rng.normal(0, 1 / math.sqrt(size[0]), size).astype(np.float32) if len(size) == 2
+        else np.zeros(size, dtype=np.float32)
+        for size in Policy.sizes(POLICY_SHAPE)
+    ]
+    m = [np.zeros_like(layer) for layer in layers]
+    v = [np.zeros_like(layer) for layer in layers]
+    t = 0
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(x))
+        for start in range(0, len(x), batch):
+            idx = order[start:start + batch]
+            xb, yb = x[idx], y[idx]
+            h, out = forward(layers, xb)
+
+            d_out = 2 * (out - yb) / len(xb)
+            d_z = np.stack([
+                d_out[:, 0] * (1 - out[:, 0] ** 2),
+                d_out[:, 1] * out[:, 1] * (1 - out[:, 1]),
+            ], axis=1)
+            w1, b1, w2, b2 = layers
+            d_h = (d_z @ w2.T) * (1 - h ** 2)
+            grads = [xb.T @ d_h, d_h.sum(0), h.T @ d_z, d_z.sum(0)]
+
+            t += 1
+            for layer, grad, m_i, v_i in zip(layers, grads, m, v):
+                m_i[:] = 0.9 * m_i + 0.1 * grad
+                v_i[:] = 0.999 * v_i + 0.001 * grad ** 2
+                m_hat = m_i / (1 - 0.9 ** t)
+                v_hat = v_i / (1 - 0.999 ** t)
+                layer -= lr * m_hat / (np.sqrt(v_hat) + 1e-8)
+
+        if epoch % 20 == 0 or epoch == epochs - 1:
+            loss = np.mean((forward(layers, x)[1] - y) ** 2)
+            print(f'epoch {epoch:>4} | loss {loss:.4f}', file=sys.stderr)
+    return layers
+
+
+def race(driver, checkpoints, laps=1, limit=400):
+    """turns a driver needs for the laps, limit if it never finishes"""
+    pod = start_pod(checkpoints)
+    goal = laps * len(checkpoints)
+    for turn in range(limit):
+        step(pod, *driver(pod, checkpoints), checkpoints)
+        if pod.passed >= goal:
+            return turn + 1
+    return limit
+
+
+def evaluate(policy, rng, tracks):
+    def mlp(pod, checkpoints):
+        (turn,), (thrust,) = policy(features([pod], [checkpoints[pod.cp_id].pos]))
+        return turn, thrust
+
+    held_out = [random_track(rng) for _ in range(tracks)]
+    for name, driver in (('search', teacher), ('mlp', mlp)):
+        start = time.perf_counter()
+        turns = [race(driver, track) for track in held_out]
+        per_turn = (time.perf_counter() - start) * 1000 / sum(turns)
+        print(f'{name:<6}| mean turns per lap: {np.mean(turns):6.1f} | {per_turn:.3f}ms per turn', file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--episodes', type=int, default=400)
+    parser.add_argument('--turns', type=int, default=150)
+    parser.add_argument('--noise', type=float, default=0.3, help='chance of a random turn while collecting')
+    parser.add_argument('--epochs', type=int, default=300)
+    parser.add_argument('--batch', type=int, default=256)
+    parser.add_argument('--lr', type=float, default=3e-3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--write', action='store_true', help='embed the weights into bronze.py')
+    args = parser.parse_args(argv)
+
+    bronze.precompute()
+    rng = random.Random(args.seed)
+    x, y = collect(rng, args.episodes, args.turns, args.noise)
+    print(f'{len(x)} samples', file=sys.stderr)
+
+    layers = train(x, y, args.epochs, args.batch, args.lr, args.seed)
+    packed = Policy.pack(layers)
+    policy = Policy(packed, POLICY_SHAPE)
+    evaluate(policy, rng, tracks=20)
+
+    if args.write:
+        source = BOT.read_text()
+        source = re.sub(r"^POLICY_WEIGHTS = .*$", f"POLICY_WEIGHTS = '{packed}'", source, count=1, flags=re.M)
+        BOT.write_text(source)
+    else:
+        print(packed)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,71 @@
 import sys
 from collections import Counter
+from collections import OrderedDict
 from dataclasses import dataclass
 from dataclasses import field
 from functools import partial
+from math import prod
 from operator import itemgetter
 
 log = partial(print, file=sys.stderr, flush=True)
 
 RESET_STR = 'GAME_OVER'
 POSSIBLE_MOVES = 'UP', 'DOWN', 'LEFT', 'RIGHT'
+MOVE_ABBREV = {
+    'U': 'UP',
+    'D': 'DOWN',
+    'L': 'LEFT',
+    'R': 'RIGHT',
+}
+
+MATCH_TURNS = 100
+ROUND_POINTS = 1  # medal points (3 gold, 1 silver) we expect from a future round
+TT_MEMORY_CAP = 8 * 1024 * 1024  # bytes
+
+
+class TranspositionTable:
+    """LRU of per-move value vectors shared across turns and rounds
+
+    entries are evicted oldest first once their estimated size goes over
+    the memory cap
+    """
+
+    def __init__(self, memory_cap):
+        self.memory_cap = memory_cap
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def entry_size(key, values):
+        return sum(map(sys.getsizeof, (*key, key, values, *values))) + 100  # + dict slot and links
+
+    def get(self, key):
+        values = self.entries.get(key)
+        if values is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return values
+
+    def put(self, key, values):
+        self.entries[key] = values
+        self.size += self.entry_size(key, values)
+        while self.size > self.memory_cap:
+            old_key, old_values = self.entries.popitem(last=False)
+            self.size -= self.entry_size(old_key, old_values)
+
+    @property
+    def hit_rate(self):
+        return self.hits / ((self.hits + self.misses) or 1)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+TT = TranspositionTable(TT_MEMORY_CAP)
 
 player_idx = int(input())
 nb_games = int(input())
@@ -27,15 +84,15 @@ class ArcadeGame:
 
     reg: list[int] = field(init=False, default_factory=list)
 
-    move_abbrev: dict[str, str] = field(init=False, default_factory=lambda: {
-        'U': 'UP',
-        'D': 'DOWN',
-        'L': 'LEFT',
-        'R': 'RIGHT',
-    })
-
     medals: list[int] = field(init=False, default_factory=list)
 
+    round_turns = 15  # length of a fresh round, roughly
+    plan = {}  # per game type, survives between turns until the game resets
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.plan = {}
+
     def __post_init__(self):
         self.reg = [
             self.reg_0,
@@ -46,99 +103,237 @@ class ArcadeGame:
             self.reg_5,
             self.reg_6,
         ]
+        if self.game_over:
+            self.plan.clear()
 
     @classmethod
     def from_input(cls):
         gpu, *regs = input().split()
         return cls(gpu, *map(int, regs))
 
-    def decide_weight(self):
+    @property
+    def game_over(self):
+        return self.gpu == RESET_STR
+
+    @property
+    def medal_points(self):
         gold, silver, bronze = self.medals
+        return 3 * gold + silver
 
-        if not (gold or silver):
-            return 30
-        return 1
+    def turns_left(self):
+        """turns until the current round hands out medals"""
+        raise NotImplementedError
 
-    def next_move(self):
+    def rounds_left(self, match_turns_left):
+        """fresh rounds that still fit in the match after this one"""
+        after = match_turns_left - self.turns_left() - 1  # one turn shows GAME_OVER
+        return max(0, after // (self.round_turns + 1))
+
+    def move_values(self) -> dict[str, float]:
+        """how good each move is for this game, in its own units"""
+        raise NotImplementedError
+
+    def inputs(self):
+        """everything move_values reads, other registers do not change the values"""
         raise NotImplementedError
 
+    @property
+    def key(self):
+        return self.__class__.__name__, self.game_over, *self.inputs()
+
+    def normalized_values(self):
+        """move values scaled to 0 (worst) .. 1 (best), looked up in TT first"""
+        if (vector := TT.get(self.key)) is None:
+            values = self.move_values()
+            low, high = min(values.values()), max(values.values())
+            vector = tuple(
+                (values[move] - low) / (high - low) if high > low else 0.0
+                for move in POSSIBLE_MOVES
+            )
+            TT.put(self.key, vector)
+        return dict(zip(POSSIBLE_MOVES, vector))
+
+    def next_move(self):
+        return max(self.move_values().items(), key=itemgetter(1))[0]
+
+
+def decide_weights(games, match_turns_left):
+    """how much each game's current round matters to the final score
+
+    the final score is the product of every game's medal points, so a game
+    is weighted by the points projected for all the others by match end;
+    a round that is resetting or cannot finish before the match ends is
+    worth nothing
+    """
+    projected = [
+        g.medal_points + ROUND_POINTS * g.rounds_left(match_turns_left) + 1
+        for g in games
+    ]
+    weights = []
+    for i, g in enumerate(games):
+        if g.game_over or g.turns_left() > match_turns_left:
+            weights.append(0)
+            continue
+        weights.append(prod(projected[:i] + projected[i + 1:]))
+    return weights
+
 
 class Hurdles(ArcadeGame):
+    round_turns = 12
     moves = {
-        '#'  : 'UP',
-        '...': 'RIGHT',
-        '..' : 'DOWN',
-        '.'  : 'LEFT',
+        'UP'   : (2, True),  # distance, jumps over the first field
+        'LEFT' : (1, False),
+        'DOWN' : (2, False),
+        'RIGHT': (3, False),
     }
+    STUN = 3
 
     @property
-    def look_ahead(self):
-        """return str of next 3 fields"""
-        pp = self.reg[player_idx] + 1  # player pos
-        look = self.gpu[pp: pp + 3].rjust(3, '.')
-        return look
-
-    def next_move(self):
-        move = next(
-            (
-                v
-                for k, v in self.moves.items()
-                if self.look_ahead.startswith(k)
-            ),
-            'UP'  # default
-        )
-        return move
+    def finish(self):
+        return len(self.gpu) - 1
+
+    def land(self, pos, move):
+        """(field reached, stunned) moving from pos"""
+        distance, jump = self.moves[move]
+        for step in range(1, distance + 1):
+            field_ = min(pos + step, self.finish)
+            if self.gpu[field_] == '#' and not (jump and step == 1):
+                return field_, True
+            if field_ == self.finish:
+                return field_, False
+        return min(pos + distance, self.finish), False
+
+    def turns_to_finish(self):
+        """fewest turns to the finish from every field, one DP per track"""
+        if self.plan.get('track') != self.gpu:
+            cost = [0] * len(self.gpu)
+            for pos in reversed(range(self.finish)):
+                cost[pos] = min(
+                    1 + self.STUN * stunned + cost[land]
+                    for land, stunned in (self.land(pos, move) for move in self.moves)
+                )
+            self.plan.update(track=self.gpu, cost=cost)
+        return self.plan['cost']
+
+    def turns_left(self):
+        if self.game_over:
+            return 0
+        leader = max(self.reg[:3])
+        return -(-(self.finish - leader) // 3)
+
+    def inputs(self):
+        pos, stun = self.reg[player_idx], self.reg[3 + player_idx]
+        return self.gpu[pos:], bool(stun)  # only the track ahead matters
+
+    def move_values(self):
+        pos, stun = self.reg[player_idx], self.reg[3 + player_idx]
+        if self.game_over or stun or pos >= self.finish:
+            return dict.fromkeys(self.moves, 0)
+
+        cost = self.turns_to_finish()
+        values = {}
+        for move in self.moves:
+            land, stunned = self.land(pos, move)
+            values[move] = -(1 + self.STUN * stunned + cost[land])
+        return values
 
 
 class Archery(ArcadeGame):
+    round_turns = 12
     moves = {
         'UP'   : (0, -1),
         'DOWN' : (0, 1),
         'LEFT' : (-1, 0),
         'RIGHT': (1, 0),
     }
-
-    def new_positions(self) -> dict[str, tuple[int]]:
+    LIMIT = 20
+
+    def final_distance(self, wind, x, y):
+        """smallest squared distance reachable with the remaining wind
+
+        the target is symmetric, so (x, y) is folded to (small, big) and
+        the memo is shared by every turn of the round
+        """
+        x, y = sorted((abs(x), abs(y)))
+        if not wind:
+            return x * x + y * y
+        key = wind, x, y
+        if (best := self.plan.get(key)) is None:
+            strength, rest = int(wind[0]), wind[1:]
+            best = min(
+                self.final_distance(rest, *self.shoot(x, y, dx, dy, strength))
+                for dx, dy in self.moves.values()
+            )
+            self.plan[key] = best
+        return best
+
+    def shoot(self, x, y, dx, dy, strength):
+        limit = self.LIMIT
+        return min(max(x + dx * strength, -limit), limit), min(max(y + dy * strength, -limit), limit)
+
+    def turns_left(self):
+        return 0 if self.game_over else len(self.gpu)
+
+    def inputs(self):
+        return self.gpu, self.reg[player_idx * 2], self.reg[player_idx * 2 + 1]
+
+    def move_values(self):
+        if self.game_over:
+            return dict.fromkeys(self.moves, 0)
         coord_pos = itemgetter(player_idx * 2, player_idx * 2 + 1)
         x, y = coord_pos(self.reg)
-        try:
-            v = int(self.gpu[0])
-        except ValueError:
-            v = 0
-        new_pos = {
-            move: abs(x + dx * v) + abs(y + dy * v)
+        strength, rest = int(self.gpu[0]), self.gpu[1:]
+        return {
+            move: -self.final_distance(rest, *self.shoot(x, y, dx, dy, strength))
             for move, (dx, dy) in self.moves.items()
         }
-        return new_pos
-
-    def next_move(self) -> str:
-        positions = self.new_positions()
-        best_first = sorted(positions.items(), key=itemgetter(1))
-        best_move = best_first[0][0]
-        return best_move
 
 
 class Roller(ArcadeGame):
-
-    def next_move(self):
-        # go for zero risk
-        # TODO: improve this
-        letter = self.gpu[2]
-        move = self.move_abbrev.get(letter, 'UP')
-        return move
+    round_turns = 15
+    # position in the gpu string -> (fields moved, risk gained)
+    steps = (1, -1), (2, 0), (2, 1), (3, 2)
+    MAX_RISK = 5
+    STUN = 2
+
+    def turns_left(self):
+        return 0 if self.game_over else self.reg_6
+
+    def inputs(self):
+        risk = self.reg[3 + player_idx]
+        if risk < 0:
+            return None,
+        # the round length only matters as far as it caps the stun
+        return self.gpu, risk, max(0, min(self.STUN, self.turns_left() - 1))
+
+    def move_values(self):
+        risk = self.reg[3 + player_idx]
+        if self.game_over or risk < 0:  # negative risk is a stun timer
+            return dict.fromkeys(POSSIBLE_MOVES, 0)
+
+        values = {}
+        for letter, (distance, gain) in zip(self.gpu, self.steps):
+            stunned = risk + gain >= self.MAX_RISK
+            # stun only costs what is left of the round
+            lost = max(0, min(self.STUN, self.turns_left() - 1)) * 2 if stunned else 0
+            values[MOVE_ABBREV[letter]] = distance - lost
+        return values
 
 
 class Diving(ArcadeGame):
+    round_turns = 12
 
-    def next_move(self):
-        # TODO: improve this
-        letter = self.gpu[0]
-        move = self.move_abbrev.get(letter, 'UP')
-        return move
+    def turns_left(self):
+        return 0 if self.game_over else len(self.gpu)
+
+    def inputs(self):
+        return self.gpu[:1],
 
-    def decide_weight(self):
-        sw = super().decide_weight()
-        return max(sw, 2)
+    def move_values(self):
+        values = dict.fromkeys(POSSIBLE_MOVES, 0)
+        if not self.game_over:
+            values[MOVE_ABBREV[self.gpu[0]]] = 1
+        return values
 
 
 def parse_score():
@@ -150,32 +345,41 @@ def parse_score():
     return my_score
 
 
+turn = 0
+
 while True:
 
     my_score = parse_score()
     total_score = my_score.pop(0)
 
-    weighted_moves = Counter(dict.fromkeys(POSSIBLE_MOVES, 0))
-
+    games = []
     for i, game in enumerate((Hurdles, Archery, Roller, Diving)):
         # create games and attach medals
         g = game.from_input()
         g.medals = my_score[i * 3:(i + 1) * 3]
+        games.append(g)
+
+    weighted_moves = Counter(dict.fromkeys(POSSIBLE_MOVES, 0))
+    weights = decide_weights(games, MATCH_TURNS - turn)
 
-        # decide weight and move
-        weight = g.decide_weight()
-        selected_move = g.next_move()
+    for g, weight in zip(games, weights):
+        values = g.normalized_values()
 
         # add to decision pool
-        weighted_moves[selected_move] += weight
+        for move, value in values.items():
+            weighted_moves[move] += weight * value
         # log decision
         log(
             f'{g.__class__.__name__:<8}'
             f'| medals: {g.medals}'
-            f'| move: {selected_move:<5}'
+            f'| move: {max(values, key=values.get):<5}'
             f'| weight: {weight}'
+            f'| left: {g.turns_left()}'
         )
 
+    log(f'tt: {TT.hit_rate:.0%} hits | {len(TT)} entries | {TT.size // 1024}kB')
+
     best_move = weighted_moves.most_common()[0][0]
 
     print(best_move)
+    turn += 1
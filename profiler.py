@@ -0,0 +1,221 @@
+"""Sampling profiler for the bots' main loops.
+
+A CPU-time interval timer (SIGPROF) interrupts the bot every millisecond
+of CPU it burns and the handler records the stack it interrupted, so time
+spent blocked in input() waiting for the referee is never sampled. Stacks
+are kept in the collapsed format flame graph tools read
+(`frame;frame;frame weight`, weights in microseconds of CPU).
+
+Any tooling that starts bots through `records.bot_command` profiles them
+when the BOT_PROFILE environment variable names a directory:
+
+    BOT_PROFILE=prof python -m seabed_security.benchmark --seeds 5
+    python profiler.py report prof/*.folded --top 15
+
+or, on recorded matches (see records.py):
+
+    python profiler.py replay records/*.rec --out prof
+"""
+import argparse
+import builtins
+import os
+import runpy
+import signal
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import records
+
+ROOT = Path(__file__).resolve().parent
+ENV_VAR = 'BOT_PROFILE'
+INTERVAL_MS = 1
+
+# frames of the launchers themselves, cut from the top of every stack
+TOOL_FILES = {'profiler.py', 'records.py', '<frozen runpy>'}
+
+
+class Sampler:
+    """collapsed stacks of the main thread, one per SIGPROF tick
+
+    ticks come at the kernel's timer resolution rather than exactly every
+    interval, so each sample is weighted by the CPU time since the last one
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.cpu = 0.0
+        self.paused = False
+        self.stacks = Counter()
+        self.names = {}  # code object -> frame name
+        self.dirty = False
+
+    def name(self, code):
+        if (name := self.names.get(code)) is None:
+            filename = code.co_filename
+            path = Path(filename if filename.startswith('<') else os.path.abspath(filename))
+            # our files relative to the repository, the standard library by file name
+            path = path.relative_to(ROOT).as_posix() if path.is_relative_to(ROOT) else path.name
+            name = self.names[code] = f'{path}:{code.co_qualname}'
+        return name
+
+    def stack(self, frame):
+        names = []
+        while frame is not None:
+            names.append(self.name(frame.f_code))
+            frame = frame.f_back
+        names.reverse()
+        start, end = 0, len(names)
+        while start < end and names[start].partition(':')[0] in TOOL_FILES:
+            start += 1
+        # the input/print hooks at the leaf count as their caller, like any builtin
+        while end > start and names[end - 1].partition(':')[0] in TOOL_FILES:
+            end -= 1
+        return ';'.join(names[start:end])
+
+    def sample(self, signum, frame):
+        if self.paused:
+            return
+        cpu, self.cpu = self.cpu, time.process_time()
+        if stack := self.stack(frame):
+            self.stacks[stack] += int((self.cpu - cpu) * 1e6)
+            self.dirty = True
+
+    def start(self):
+        self.cpu = time.process_time()
+        signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+
+    def save(self, path):
+        """write the stacks so far, the time this takes is not sampled"""
+        self.paused, self.dirty = True, False
+        try:
+            tmp = path.with_suffix('.tmp')
+            tmp.write_text(''.join(f'{stack} {weight}\n' for stack, weight in self.stacks.items()))
+            os.replace(tmp, path)
+        finally:
+            self.cpu = time.process_time()
+            self.paused = False
+
+
+def profile_path(directory, bot):
+    bot = Path(bot)
+    name = f'{bot.parent.name}-{bot.stem}-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.folded'
+    return Path(directory) / name
+
+
+def run(argv, out, interval):
+    """run a script as __main__ under the sampler, argv[0] being the script"""
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    sampler = Sampler(interval)
+    real_input = builtins.input
+
+    def profiled_input(prompt=''):
+        if sampler.dirty:
+            # saved every turn, bots are killed at match end so there is no exit to save at
+            sys.stdout.flush()  # the action goes out first
+            sampler.save(out)
+        return real_input(prompt)
+
+    builtins.input = profiled_input
+    sys.argv = list(argv)
+    sys.path[0] = str(Path(argv[0]).resolve().parent)
+    sampler.start()
+    try:
+        runpy.run_path(argv[0], run_name='__main__')
+    except EOFError:
+        pass  # the referee closed the pipe, match over
+    finally:
+        builtins.input = real_input
+        sampler.stop()
+        sampler.save(out)
+
+
+# ========== reports ==========
+
+def load(paths):
+    """collapsed stacks of many profiles merged into one"""
+    stacks = Counter()
+    for path in paths:
+        for line in Path(path).read_text().splitlines():
+            stack, _, weight = line.rpartition(' ')
+            stacks[stack] += int(weight)
+    return stacks
+
+
+def function_times(stacks):
+    """{function: (self us, total us)}, recursion counted once for the total"""
+    self_time, total_time = Counter(), Counter()
+    for stack, weight in stacks.items():
+        frames = stack.split(';')
+        self_time[frames[-1]] += weight
+        for frame in set(frames):
+            total_time[frame] += weight
+    return {frame: (self_time[frame], total) for frame, total in total_time.items()}
+
+
+def cmd_run(args):
+    directory = args.out or os.environ.get(ENV_VAR) or '.'
+    bot = next((arg for arg in reversed(args.argv) if arg.endswith('.py')), args.argv[0])
+    run(args.argv, profile_path(directory, bot), args.interval / 1000)
+
+
+def cmd_report(args):
+    stacks = load(args.files)
+    sampled = sum(stacks.values()) or 1
+    print(f'{len(args.files)} profiles | {sampled / 1000:.1f}ms sampled')
+    print(f'{"self ms":>10} {"self %":>7} {"total ms":>10}  function')
+    times = function_times(stacks)
+    for frame, (self_us, total_us) in sorted(times.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f'{self_us / 1000:10.1f} {100 * self_us / sampled:6.1f}% {total_us / 1000:10.1f}  {frame}')
+    if args.folded:
+        Path(args.folded).write_text(''.join(f'{stack} {weight}\n' for stack, weight in stacks.items()))
+
+
+def cmd_replay(args):
+    out = Path(args.out)
+    os.environ[ENV_VAR] = str(out)
+    started = time.time()
+    for path in args.files:
+        with records.Recording(path) as rec:
+            for _ in records.replay(rec, args.bot):
+                pass
+    args.files = [path for path in out.glob('*.folded') if path.stat().st_mtime >= started]
+    cmd_report(args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run a script (usually a bot) under the profiler')
+    run_parser.add_argument('--out', help=f'directory for the profile, default ${ENV_VAR}')
+    run_parser.add_argument('--interval', type=float, default=INTERVAL_MS, help='ms of CPU between samples')
+    run_parser.add_argument('argv', nargs=argparse.REMAINDER)
+    run_parser.set_defaults(func=cmd_run)
+
+    report_parser = commands.add_parser('report', help='per function self time over many profiles')
+    report_parser.add_argument('files', nargs='+')
+    report_parser.set_defaults(func=cmd_report)
+
+    replay_parser = commands.add_parser('replay', help='profile a bot on recorded matches and report')
+    replay_parser.add_argument('files', nargs='+')
+    replay_parser.add_argument('--bot', help='bot file to replay against, default the recorded one')
+    replay_parser.add_argument('--out', default='profiles', help='directory for the profiles')
+    replay_parser.set_defaults(func=cmd_replay)
+
+    for sub in (report_parser, replay_parser):
+        sub.add_argument('--top', type=int, default=20)
+        sub.add_argument('--folded', help='write the merged collapsed stacks here')
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""Compact binary recordings of bot matches.
+
+A recording starts with a small header naming the bot, followed by one
+length-prefixed record per turn: the raw input lines the bot read, the
+action lines it printed and how long it thought in between.
+
+    python records.py run coders_strike_back/bronze.py   # records into $BOT_RECORD
+    python records.py show match.rec
+    python records.py stats records/*.rec
+    python records.py replay match.rec --bot olymbits/silver.py
+
+Any tooling that starts bots through `bot_command` records them when the
+BOT_RECORD environment variable names a directory, e.g.
+
+    BOT_RECORD=records python -m seabed_security.benchmark --seeds 5
+"""
+import argparse
+import builtins
+import mmap
+import os
+import runpy
+import statistics
+import struct
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from collections import namedtuple
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+ENV_VAR = 'BOT_RECORD'
+
+MAGIC = b'CGREC\x01'
+BOT_NAME = struct.Struct('<H')  # length of the bot path that follows the magic
+RECORD = struct.Struct('<IIIf')  # turn, input bytes, output bytes, think ms
+
+Turn = namedtuple('Turn', 'turn think_ms input output')
+
+
+def bot_command(bot):
+    """argv starting a bot, wrapped in the recorder when BOT_RECORD is set
+
+    and in the sampling profiler when BOT_PROFILE is, see profiler.py
+    """
+    command = [str(bot)]
+    if os.environ.get(ENV_VAR):
+        command = [str(ROOT / 'records.py'), 'run', *command]
+    if os.environ.get('BOT_PROFILE'):
+        command = [str(ROOT / 'profiler.py'), 'run', *command]
+    return [sys.executable, *command]
+
+
+# ========== writing ==========
+
+class Recorder:
+    """collects one turn at a time and appends it to the stream
+
+    a turn is everything read since the previous action and is closed
+    once the bot flushes its output (input() does that before reading);
+    records are flushed right away as the referee kills bots at match end
+    """
+
+    def __init__(self, stream, bot):
+        self.stream = stream
+        self.turn = 0
+        self.lines_in = []
+        self.lines_out = []
+        self.read_at = self.written_at = 0.0
+        name = str(bot).encode()
+        stream.write(MAGIC + BOT_NAME.pack(len(name)) + name)
+
+    def read(self, line):
+        if self.lines_out:
+            self.flush()
+        self.lines_in.append(line)
+        self.read_at = time.perf_counter()
+
+    def write(self, text):
+        self.lines_out.append(text)
+        self.written_at = time.perf_counter()
+
+    def flush(self):
+        if not (self.lines_in or self.lines_out):
+            return
+        data_in = '\n'.join(self.lines_in).encode()
+        data_out = ''.join(self.lines_out).rstrip('\n').encode()
+        think_ms = max(0.0, self.written_at - self.read_at) * 1000 if self.lines_out else 0.0
+        self.stream.write(RECORD.pack(self.turn, len(data_in), len(data_out), think_ms) + data_in + data_out)
+        self.stream.flush()
+        self.turn += 1
+        self.lines_in.clear()
+        self.lines_out.clear()
+
+    def close(self):
+        self.flush()
+        self.stream.close()
+
+
+class _Tee:
+    """stdout that also hands every write to the recorder"""
+
+    def __init__(self, stream, recorder):
+        self._stream = stream
+        self._recorder = recorder
+
+    def write(self, text):
+        if text:  # input() writes its empty prompt here too
+            self._recorder.write(text)
+        return self._stream.write(text)
+
+    def flush(self):
+        if self._recorder.lines_out:
+            self._recorder.flush()
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _bot_name(bot):
+    """bot path relative to the repository when inside it"""
+    bot = Path(bot).resolve()
+    return bot.relative_to(ROOT) if bot.is_relative_to(ROOT) else bot
+
+
+def record_path(directory, bot):
+    bot = Path(bot)
+    name = f'{bot.parent.name}-{bot.stem}-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.rec'
+    return Path(directory) / name
+
+
+def run(bot, out):
+    """run a bot file as __main__ with its input and output recorded"""
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    recorder = Recorder(out.open('wb'), _bot_name(bot))
+    real_input = builtins.input
+
+    def recorded_input(prompt=''):
+        line = real_input(prompt)
+        recorder.read(line)
+        return line
+
+    builtins.input = recorded_input
+    sys.stdout = _Tee(sys.stdout, recorder)
+    sys.path[0] = str(Path(bot).resolve().parent)
+    try:
+        runpy.run_path(str(bot), run_name='__main__')
+    except EOFError:
+        pass  # the referee closed the pipe, match over
+    finally:
+        sys.stdout = sys.stdout._stream
+        builtins.input = real_input
+        recorder.close()
+
+
+# ========== reading ==========
+
+class Recording:
+    """memory mapped recording, turns are decoded only when asked for"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with self.path.open('rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a recording')
+        (size,) = BOT_NAME.unpack_from(self.data, len(MAGIC))
+        start = len(MAGIC) + BOT_NAME.size
+        self.bot = self.data[start:start + size].decode()
+        self.start = start + size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.data.close()
+
+    def headers(self):
+        """(turn, think ms, offset of the input bytes, input size, output size), payloads untouched"""
+        data, offset, end = self.data, self.start, len(self.data)
+        while offset + RECORD.size <= end:
+            turn, size_in, size_out, think_ms = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            yield turn, think_ms, offset, size_in, size_out
+            offset += size_in + size_out
+
+    def __iter__(self):
+        data = self.data
+        for turn, think_ms, offset, size_in, size_out in self.headers():
+            lines_in = data[offset:offset + size_in].decode().split('\n') if size_in else []
+            offset += size_in
+            lines_out = data[offset:offset + size_out].decode().split('\n') if size_out else []
+            yield Turn(turn, think_ms, lines_in, lines_out)
+
+    def think_ms(self):
+        """think time of every answered turn, the last one read before the match ended has none"""
+        return [think_ms for _, think_ms, _, _, size_out in self.headers() if size_out]
+
+
+def replay(recording, bot=None):
+    """feed the recorded inputs to a bot again, yields (recorded turn, think ms, replayed output)"""
+    proc = subprocess.Popen(
+        bot_command(ROOT / (bot or recording.bot)),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        for turn in recording:
+            if not turn.output:
+                break  # the bot never answered this one
+            start = time.perf_counter()
+            proc.stdin.write(''.join(line + '\n' for line in turn.input))
+            proc.stdin.flush()
+            replayed = [proc.stdout.readline().rstrip('\n') for _ in turn.output]
+            yield turn, (time.perf_counter() - start) * 1000, replayed
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+# ========== cli ==========
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def cmd_run(args):
+    directory = args.out or os.environ.get(ENV_VAR) or '.'
+    run(args.bot, record_path(directory, args.bot))
+
+
+def cmd_show(args):
+    with Recording(args.file) as rec:
+        print(f'bot: {rec.bot}')
+        for turn in rec:
+            print(f'--- turn {turn.turn} | {turn.think_ms:.2f}ms')
+            if args.input:
+                print(*turn.input, sep='\n')
+            print(*(f'> {line}' for line in turn.output), sep='\n')
+
+
+def cmd_stats(args):
+    times = defaultdict(list)
+    for path in args.files:
+        with Recording(path) as rec:
+            times[rec.bot] += rec.think_ms()
+    for bot, values in times.items():
+        print(
+            f'{bot:<28}'
+            f'| turns: {len(values):>6}'
+            f'| mean: {statistics.fmean(values):7.2f}ms'
+            f'| p95: {percentile(values, 0.95):7.2f}ms'
+            f'| max: {max(values):7.2f}ms'
+        )
+
+
+def cmd_replay(args):
+    diffs = 0
+    with Recording(args.file) as rec:
+        for turn, think_ms, replayed in replay(rec, args.bot):
+            same = replayed == turn.output
+            diffs += not same
+            if not same or args.verbose:
+                print(f'turn {turn.turn:>3} | {turn.think_ms:7.2f}ms -> {think_ms:7.2f}ms | {"ok" if same else "DIFF"}')
+                if not same:
+                    print(*(f'  - {line}' for line in turn.output), sep='\n')
+                    print(*(f'  + {line}' for line in replayed), sep='\n')
+    print(f'{diffs} turns differ')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run a bot and record it')
+    run_parser.add_argument('bot')
+    run_parser.add_argument('--out', help=f'directory for the recording, default ${ENV_VAR}')
+    run_parser.set_defaults(func=cmd_run)
+
+    show_parser = commands.add_parser('show', help='print the turns of a recording')
+    show_parser.add_argument('file')
+    show_parser.add_argument('--input', action='store_true', help='print the input lines too')
+    show_parser.set_defaults(func=cmd_show)
+
+    stats_parser = commands.add_parser('stats', help='think time summary per bot over many recordings')
+    stats_parser.add_argument('files', nargs='+')
+    stats_parser.set_defaults(func=cmd_stats)
+
+    replay_parser = commands.add_parser('replay', help='replay the inputs of a recording against a bot')
+    replay_parser.add_argument('file')
+    replay_parser.add_argument('--bot', help='bot file to replay against, default the recorded one')
+    replay_parser.add_argument('--verbose', action='store_true')
+    replay_parser.set_defaults(func=cmd_replay)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""Seed sweep comparing the registered drone strategies on the local engine.
+
+Every strategy plays every seed from both sides against a fixed opponent
+strategy, games run on a process pool.
+
+    python -m seabed_security.benchmark --seeds 20 --out bench.csv
+
+With --record every game is also kept as binary recordings (see records.py)
+and the think times below are taken from them.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import csv
+import json
+import os
+import statistics
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+
+from records import ENV_VAR
+from records import Recording
+from records import percentile
+from seabed_security.engine import play_game
+
+BOT = Path(__file__).with_name('silver.py')
+METRICS = 'score', 'win', 'emergencies', 'battery_used', 'think_ms', 'max_think_ms'
+
+
+def registered_strategies(bot=BOT):
+    """keys of the bot's STRATEGIES dict, read without running the bot"""
+    for node in ast.parse(Path(bot).read_text()).body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'STRATEGIES' for t in node.targets):
+            return [ast.literal_eval(key) for key in node.value.keys]
+    raise LookupError(f'no STRATEGIES registry in {bot}')
+
+
+def run_one(job):
+    strategy, opponent, seed, side = job
+    envs = [{'SEABED_STRATEGY': strategy}, {'SEABED_STRATEGY': opponent}]
+    if side:
+        envs.reverse()
+    (score, foe_score), stats = play_game(seed, (str(BOT), str(BOT)), envs)
+    if side:
+        score, foe_score = foe_score, score
+    mine = stats[side]
+    return strategy, {
+        'score': score,
+        'win': (score > foe_score) + (score == foe_score) / 2,
+        'emergencies': mine.emergencies,
+        'battery_used': mine.battery_used,
+        'think_ms': statistics.fmean(mine.think_ms) if mine.think_ms else 0.0,
+        'max_think_ms': max(mine.think_ms, default=0.0),
+        'crashed': mine.crashed,
+    }
+
+
+def summarize(samples):
+    """mean and 95% confidence half-width of every metric"""
+    summary = {'games': len(samples), 'crashes': sum(s['crashed'] for s in samples)}
+    for metric in METRICS:
+        values = [s[metric] for s in samples]
+        mean = statistics.fmean(values)
+        ci = 1.96 * statistics.stdev(values) / len(values) ** 0.5 if len(values) > 1 else 0.0
+        summary[metric] = round(mean, 3)
+        summary[f'{metric}_ci'] = round(ci, 3)
+    return summary
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, cwd=BOT.parent,
+        ).stdout.strip()
+    except OSError:
+        return ''
+
+
+def write_results(path, rows):
+    """append this run's rows, so the file tracks trends over commits"""
+    path = Path(path)
+    if path.suffix == '.json':
+        history = json.loads(path.read_text()) if path.exists() else []
+        path.write_text(json.dumps(history + rows, indent=2))
+        return
+
+    new_file = not path.exists()
+    with path.open('a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_recorded_think_times(directory, since):
+    """per turn think time of the bot, measured inside its own process"""
+    times = []
+    for path in Path(directory).glob('*.rec'):
+        if path.stat().st_mtime < since:
+            continue  # an earlier run
+        with Recording(path) as rec:
+            if Path(rec.bot).name == BOT.name:
+                times += rec.think_ms()
+    if times:
+        print(
+            f"recorded    | turns: {len(times)}"
+            f"| mean: {statistics.fmean(times):.2f}ms"
+            f"| p95: {percentile(times, 0.95):.2f}ms"
+            f"| max: {max(times):.2f}ms"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--strategies', nargs='*', default=registered_strategies())
+    parser.add_argument('--opponent', default='triangle')
+    parser.add_argument('--seeds', type=int, default=10, help='number of seeds, starting at --first-seed')
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes')
+    parser.add_argument('--out', default=None, help='.csv or .json file to append results to')
+    parser.add_argument('--record', default=None, help='directory to keep binary recordings of every game in')
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    if args.record:
+        os.environ[ENV_VAR] = args.record
+
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    jobs = [
+        (strategy, args.opponent, seed, side)
+        for strategy, seed, side in product(args.strategies, seeds, (0, 1))
+    ]
+
+    results = {strategy: [] for strategy in args.strategies}
+    with ProcessPoolExecutor(args.jobs) as pool:
+        for strategy, sample in pool.map(run_one, jobs):
+            results[strategy].append(sample)
+
+    stamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+    commit = _commit()
+    rows = [
+        {'timestamp': stamp, 'commit': commit, 'strategy': strategy, 'opponent': args.opponent,
+         'seeds': f'{seeds.start}-{seeds.stop - 1}', **summarize(samples)}
+        for strategy, samples in results.items()
+    ]
+
+    for row in rows:
+        print(
+            f"{row['strategy']:<12}"
+            f"| score: {row['score']:>6} ±{row['score_ci']:<6}"
+            f"| win: {row['win']:.2f} ±{row['win_ci']:<5}"
+            f"| emergencies: {row['emergencies']:<5}"
+            f"| battery: {row['battery_used']:<6}"
+            f"| think: {row['think_ms']:.2f}ms (max {row['max_think_ms']:.1f})"
+            f"| crashes: {row['crashes']}"
+        )
+
+    if args.record:
+        print_recorded_think_times(args.record, started)
+
+    if args.out:
+        write_results(args.out, rows)
+
+
+if __name__ == '__main__':
+    main()
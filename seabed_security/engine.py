@@ -0,0 +1,370 @@
+"""Simplified local Seabed Security referee.
+
+Not the official engine - fish and monster movement are approximations -
+but close enough to compare our own strategies against each other offline.
+Bots are run as subprocesses speaking the regular stdin/stdout protocol.
+"""
+from __future__ import annotations
+
+import os
+import random
+import selectors
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from dataclasses import field
+from math import hypot
+from math import inf
+
+from records import bot_command
+
+SIZE = 10000
+MAX_TURNS = 200
+TURN_TIMEOUT = 2.0  # seconds, far above the real limits so only a hung bot trips it
+
+SURFACE_Y = 500
+DRONE_SPEED = 600
+SINK_SPEED = 300
+EMERGENCY_SPEED = 300
+DARK_RADIUS = 800
+LIGHT_RADIUS = 2000
+LIGHT_COST = 5
+MAX_BATTERY = 30
+
+FISH_SPEED = 200
+FISH_FLEE_SPEED = 400
+FLEE_RADIUS = 1400
+MONSTER_SPEED = 270
+MONSTER_CHASE_SPEED = 540
+MONSTER_REACH = 500
+
+# y ranges each creature type lives in
+HABITAT = {
+    -1: (2500, 10000),
+    0: (2500, 5000),
+    1: (5000, 7500),
+    2: (7500, 10000),
+}
+TYPE_POINTS = {0: 1, 1: 2, 2: 3}
+COLOR_BONUS = 3
+TYPE_BONUS = 4
+
+# starting x of both drones, per player
+DRONE_STARTS = ((2000, 6000), (7999, 3999))
+
+
+@dataclass
+class Creature:
+    _id: int
+    color: int
+    type: int
+    x: float
+    y: float
+    vx: float = 0
+    vy: float = 0
+
+    @property
+    def is_monster(self):
+        return self.type == -1
+
+
+@dataclass
+class Drone:
+    _id: int
+    owner: int
+    x: float
+    y: float
+    emergency: int = 0
+    bat: int = MAX_BATTERY
+    light: bool = False
+    scans: set[int] = field(default_factory=set)
+
+    @property
+    def radius(self):
+        return LIGHT_RADIUS if self.light else DARK_RADIUS
+
+
+@dataclass
+class PlayerStats:
+    emergencies: int = 0
+    battery_used: int = 0
+    think_ms: list[float] = field(default_factory=list)
+    crashed: bool = False
+
+
+def _towards(x, y, tx, ty, speed):
+    dist = hypot(tx - x, ty - y)
+    if dist <= speed:
+        return tx, ty
+    return x + (tx - x) * speed / dist, y + (ty - y) * speed / dist
+
+
+def _with_speed(vx, vy, speed):
+    norm = hypot(vx, vy) or 1
+    return vx * speed / norm, vy * speed / norm
+
+
+def generate_creatures(rng):
+    """fish and monsters placed in pairs mirrored across x=5000"""
+    creatures = []
+    _id = 4
+    for type_ in (0, 1, 2):
+        for color in (0, 2):
+            y_min, y_max = HABITAT[type_]
+            x, y = rng.randrange(0, SIZE // 2), rng.randrange(y_min, y_max)
+            vx, vy = _with_speed(rng.uniform(-1, 1), rng.uniform(-1, 1), FISH_SPEED)
+            creatures.append(Creature(_id, color, type_, x, y, vx, vy))
+            creatures.append(Creature(_id + 1, color + 1, type_, SIZE - 1 - x, y, -vx, vy))
+            _id += 2
+
+    for _ in range(rng.randint(1, 3)):
+        x, y = rng.randrange(0, SIZE // 2), rng.randrange(5000, SIZE)
+        vx, vy = _with_speed(rng.uniform(-1, 1), rng.uniform(-1, 1), MONSTER_SPEED)
+        creatures.append(Creature(_id, -1, -1, x, y, vx, vy))
+        creatures.append(Creature(_id + 1, -1, -1, SIZE - 1 - x, y, -vx, vy))
+        _id += 2
+    return creatures
+
+
+def scores(saves, fish):
+    """score of both players from {creature id: turn saved} of each
+
+    saving a creature or completing a combo first (or in the same turn)
+    doubles its points
+    """
+    groups = defaultdict(set)
+    for c in fish:
+        groups['color', c.color].add(c._id)
+        groups['type', c.type].add(c._id)
+    kinds = {c._id: c.type for c in fish}
+
+    result = []
+    for mine, theirs in (saves, saves[::-1]):
+        score = 0
+        for _id, turn in mine.items():
+            points = TYPE_POINTS[kinds[_id]]
+            score += points * 2 if turn <= theirs.get(_id, inf) else points
+        for (kind, _), ids in groups.items():
+            if not ids <= mine.keys():
+                continue
+            bonus = COLOR_BONUS if kind == 'color' else TYPE_BONUS
+            done = max(mine[_id] for _id in ids)
+            foe_done = max(theirs.get(_id, inf) for _id in ids)
+            score += bonus * 2 if done <= foe_done else bonus
+        result.append(score)
+    return result
+
+
+class Bot:
+    """one bot subprocess
+
+    output is read from the raw pipe with our own line buffer, so a bot
+    that goes silent can be timed out instead of blocking the referee
+    """
+
+    def __init__(self, path, env=None):
+        self.proc = subprocess.Popen(
+            bot_command(path),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, **(env or {})},
+        )
+        self.buffer = b''
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.proc.stdout, selectors.EVENT_READ)
+
+    def send(self, lines):
+        self.proc.stdin.write(('\n'.join(map(str, lines)) + '\n').encode())
+        self.proc.stdin.flush()
+
+    def read(self, deadline=None):
+        """next line split in words, TimeoutError once past the deadline (a perf_counter time)"""
+        if deadline is None:
+            deadline = time.perf_counter() + TURN_TIMEOUT
+        while b'\n' not in self.buffer:
+            left = deadline - time.perf_counter()
+            if left <= 0 or not self.selector.select(left):
+                raise TimeoutError('bot did not answer in time')
+            chunk = os.read(self.proc.stdout.fileno(), 65536)
+            if not chunk:
+                raise EOFError('bot exited')
+            self.buffer += chunk
+        line, _, self.buffer = self.buffer.partition(b'\n')
+        return line.decode().split()
+
+    def close(self):
+        self.selector.close()
+        self.proc.kill()
+        self.proc.wait()
+
+
+class Referee:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.creatures = generate_creatures(self.rng)
+        self.fish = [c for c in self.creatures if not c.is_monster]
+        self.drones = [
+            Drone(player + 2 * i, player, x, SURFACE_Y)
+            for i in range(2)
+            for player, x in ((0, DRONE_STARTS[0][i]), (1, DRONE_STARTS[1][i]))
+        ]
+        self.saves = [{}, {}]
+        self.turn = 0
+        self.stats = [PlayerStats(), PlayerStats()]
+
+    def drones_of(self, player):
+        return [d for d in self.drones if d.owner == player]
+
+    # ========== protocol ==========
+
+    def initial_input(self):
+        return [len(self.creatures)] + [f'{c._id} {c.color} {c.type}' for c in self.creatures]
+
+    def turn_input(self, player):
+        foe = 1 - player
+        score = scores(self.saves, self.fish)
+        lines = [score[player], score[foe]]
+        for side in (player, foe):
+            lines += [len(self.saves[side]), *self.saves[side]]
+        for side in (player, foe):
+            drones = self.drones_of(side)
+            lines.append(len(drones))
+            lines += [f'{d._id} {d.x:.0f} {d.y:.0f} {int(d.emergency > 0)} {d.bat}' for d in drones]
+
+        drone_scans = [f'{d._id} {c}' for d in self.drones for c in sorted(d.scans)]
+        lines += [len(drone_scans), *drone_scans]
+
+        mine = self.drones_of(player)
+        visible = [
+            f'{c._id} {c.x:.0f} {c.y:.0f} {c.vx:.0f} {c.vy:.0f}'
+            for c in self.creatures
+            if any(hypot(c.x - d.x, c.y - d.y) <= d.radius for d in mine)
+        ]
+        lines += [len(visible), *visible]
+
+        blips = [
+            f'{d._id} {c._id} {"T" if c.y < d.y else "B"}{"L" if c.x < d.x else "R"}'
+            for d in mine
+            for c in self.creatures
+        ]
+        lines += [len(blips), *blips]
+        return lines
+
+    def apply(self, drone, command):
+        if drone.emergency:
+            drone.x, drone.y = _towards(drone.x, drone.y, drone.x, 0, EMERGENCY_SPEED)
+            drone.light = False
+            return
+
+        action, *args = command
+        if action == 'MOVE':
+            tx, ty, light = map(int, args[:3])
+            drone.x, drone.y = _towards(drone.x, drone.y, tx, ty, DRONE_SPEED)
+        else:
+            light = int(args[0])
+            drone.y += SINK_SPEED
+        drone.x = min(max(drone.x, 0), SIZE - 1)
+        drone.y = min(max(drone.y, 0), SIZE - 1)
+
+        drone.light = bool(light) and drone.bat >= LIGHT_COST
+        if drone.light:
+            drone.bat -= LIGHT_COST
+            self.stats[drone.owner].battery_used += LIGHT_COST
+        else:
+            drone.bat = min(MAX_BATTERY, drone.bat + 1)
+
+    # ========== simulation ==========
+
+    def move_creatures(self):
+        active = [d for d in self.drones if not d.emergency]
+        for c in self.creatures:
+            near = [d for d in active if hypot(c.x - d.x, c.y - d.y) <= (d.radius if c.is_monster else FLEE_RADIUS)]
+            if near:
+                d = min(near, key=lambda d: hypot(c.x - d.x, c.y - d.y))
+                if c.is_monster:
+                    c.vx, c.vy = _with_speed(d.x - c.x, d.y - c.y, MONSTER_CHASE_SPEED)
+                else:
+                    c.vx, c.vy = _with_speed(c.x - d.x, c.y - d.y, FISH_FLEE_SPEED)
+            else:
+                c.vx, c.vy = _with_speed(c.vx, c.vy, MONSTER_SPEED if c.is_monster else FISH_SPEED)
+
+            y_min, y_max = HABITAT[c.type]
+            c.x, c.y = c.x + c.vx, c.y + c.vy
+            if not 0 <= c.x < SIZE:
+                c.x, c.vx = min(max(c.x, 0), SIZE - 1), -c.vx
+            if not y_min <= c.y < y_max:
+                c.y, c.vy = min(max(c.y, y_min), y_max - 1), -c.vy
+
+    def resolve(self):
+        monsters = [c for c in self.creatures if c.is_monster]
+        for d in self.drones:
+            if d.emergency:
+                if d.y <= SURFACE_Y:
+                    d.emergency = 0
+                continue
+            if any(hypot(m.x - d.x, m.y - d.y) <= MONSTER_REACH for m in monsters):
+                d.emergency = 1
+                d.scans.clear()
+                self.stats[d.owner].emergencies += 1
+                continue
+
+            saved = self.saves[d.owner]
+            for c in self.fish:
+                if c._id not in saved and hypot(c.x - d.x, c.y - d.y) <= d.radius:
+                    d.scans.add(c._id)
+            if d.y <= SURFACE_Y:
+                for _id in d.scans:
+                    saved.setdefault(_id, self.turn)
+                d.scans.clear()
+
+    def finished(self):
+        everything = len(self.fish)
+        return self.turn >= MAX_TURNS or all(len(s) == everything for s in self.saves)
+
+    def play(self, bots):
+        for bot in bots:
+            bot.send(self.initial_input())
+
+        while not self.finished():
+            commands = []
+            for player, bot in enumerate(bots):
+                drones = self.drones_of(player)
+                stats = self.stats[player]
+                if stats.crashed:
+                    commands.append([['WAIT', '0']] * len(drones))
+                    continue
+                try:
+                    start = time.perf_counter()
+                    bot.send(self.turn_input(player))
+                    deadline = start + TURN_TIMEOUT
+                    commands.append([bot.read(deadline) for _ in drones])
+                    stats.think_ms.append((time.perf_counter() - start) * 1000)
+                except (EOFError, TimeoutError, OSError, ValueError):
+                    stats.crashed = True
+                    commands.append([['WAIT', '0']] * len(drones))
+
+            for player, player_commands in enumerate(commands):
+                for drone, command in zip(self.drones_of(player), player_commands):
+                    try:
+                        self.apply(drone, command)
+                    except (ValueError, IndexError):
+                        self.stats[player].crashed = True
+
+            self.move_creatures()
+            self.resolve()
+            self.turn += 1
+
+        return scores(self.saves, self.fish)
+
+
+def play_game(seed, bots, envs=(None, None)):
+    """play one seed between two bot files, returns (scores, stats)"""
+    referee = Referee(seed)
+    processes = [Bot(path, env) for path, env in zip(bots, envs)]
+    try:
+        return referee.play(processes), referee.stats
+    finally:
+        for process in processes:
+            process.close()
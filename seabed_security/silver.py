@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import os
 import sys
 from collections import defaultdict
+from collections import deque
+from collections import namedtuple
 from dataclasses import dataclass
 from dataclasses import field
 from enum import Enum
+from functools import lru_cache
 from functools import partial
-from pprint import pprint
+from math import hypot
+from math import inf
 from collections import Counter
 from typing import Any
 from itertools import cycle
+from itertools import permutations
 
-_debug = partial(pprint, stream=sys.stderr)
+
+def _debug(obj):
+    from pprint import pprint  # only pulled in while debugging
+
+    pprint(obj, stream=sys.stderr)
 
 
 class Color(Enum):
@@ -57,12 +67,65 @@ class Registerable:
             Registerable.register[cls][id] = obj
         return obj
 
+    @classmethod
+    def get(cls, id):
+        """registered object without re-running its __init__"""
+        return Registerable.register[cls].get(id) or cls(id)
+
+
+HISTORY_SIZE = 10  # samples kept per entity
+EXTRAPOLATE_TURNS = 3  # a seen velocity is trusted this long, creatures turn around
+PRIOR_FADE = 8  # turns until a position prior has faded into the radar box middle
+
+Sample = namedtuple('Sample', 'x y vx vy turn')
+
+
+class Tracked:
+    """entity remembering its last HISTORY_SIZE samples in a ring buffer
+
+    `x`, `y`, `vx`, `vy` always mirror the newest sample
+    """
+
+    def observe(self, turn, x, y, vx=None, vy=None):
+        if vx is None and self.history:
+            last = self.history[-1]
+            dt = max(1, turn - last.turn)
+            vx, vy = (x - last.x) // dt, (y - last.y) // dt
+        sample = Sample(x, y, vx or 0, vy or 0, turn)
+        self.history.append(sample)
+        self.x, self.y, self.vx, self.vy = x, y, sample.vx, sample.vy
+
+    @property
+    def pos(self):
+        return self.x, self.y
+
+    def last_seen(self, turn):
+        """turns since the newest sample, None if never seen"""
+        if not self.history:
+            return None
+        return turn - self.history[-1].turn
+
+    def extrapolate(self, turn):
+        """position at turn assuming the newest velocity holds for a few turns"""
+        x, y, vx, vy, seen = self.history[-1]
+        dt = min(turn - seen, EXTRAPOLATE_TURNS)
+        return min(max(x + vx * dt, 0), 9999), min(max(y + vy * dt, 0), 9999)
+
 
 def _dist(this, that):
     return abs(this.x - that.x) + abs(this.y - that.y)
 
+
+# y ranges each creature type lives in
+HABITAT = {
+    Type.MONSTER: (2500, 10000),
+    Type.SQUID: (2500, 5000),
+    Type.FISH: (5000, 7500),
+    Type.CRAB: (7500, 10000),
+}
+
 @dataclass
-class Creature(Registerable):
+class Creature(Registerable, Tracked):
     _id: int
     _color: Color
     _type: Type
@@ -74,8 +137,11 @@ class Creature(Registerable):
 
     scanned: bool = field(init=False, default=False)
 
-    def __post_init__(self):
-        self.pos = self.x, self.y
+    history: deque[Sample] = field(init=False, repr=False, default_factory=partial(deque, maxlen=HISTORY_SIZE))
+
+    # mirrored across x=5000, see mirror_pairs()
+    twin: Creature | None = field(init=False, default=None, repr=False, compare=False)
+    guess: tuple[int, int] | None = field(init=False, default=None)
 
     @classmethod
     def from_str(cls, s):
@@ -85,6 +151,53 @@ class Creature(Registerable):
     def __hash__(self):
         return self._id
 
+    def on_radar(self):
+        """still in the map, creatures that left it get no more blips"""
+        return any(self in drone.radar for drone in Drone.register.values())
+
+    def radar_box(self):
+        """(x_min, x_max, y_min, y_max) the radars and habitat agree on"""
+        x_min, x_max = 0, 9999
+        y_min, y_max = HABITAT[self._type]
+        for drone in Drone.register.values():
+            if not (direction := drone.radar.get(self)):
+                continue
+            if 'L' in direction:
+                x_max = min(x_max, drone.x)
+            else:
+                x_min = max(x_min, drone.x)
+            if 'T' in direction:
+                y_max = min(y_max, drone.y)
+            else:
+                y_min = max(y_min, drone.y)
+
+        if x_min > x_max or y_min > y_max:
+            x_min, x_max = 0, 9999
+            y_min, y_max = HABITAT[self._type]
+        return x_min, x_max, y_min, y_max
+
+    def locate(self, prior, age=None):
+        """prior position clipped to the radar box, its middle without one
+
+        the older the prior (age in turns), the more it is pulled towards
+        the middle of the box
+        """
+        x_min, x_max, y_min, y_max = self.radar_box()
+        mid_x, mid_y = (x_min + x_max) // 2, (y_min + y_max) // 2
+        if prior is None:
+            return mid_x, mid_y
+        x, y = prior
+        if age is not None:
+            w = max(0, 1 - age / PRIOR_FADE)
+            x, y = w * x + (1 - w) * mid_x, w * y + (1 - w) * mid_y
+        return int(min(max(x, x_min), x_max)), int(min(max(y, y_min), y_max))
+
+    def estimate(self):
+        """position guess of this turn, see update_estimates()"""
+        if self.guess is None:
+            self.guess = self.locate(self.extrapolate(TURN) if self.history else None, self.last_seen(TURN))
+        return self.guess
+
     def __str__(self):
         return f'{self._color.name}_{self._type.name}_{self._id}({self.x}, {self.y}) {self.scanned}'
 
@@ -122,7 +235,7 @@ u_turn_coords = {
 }
 
 @dataclass
-class Drone(Registerable):
+class Drone(Registerable, Tracked):
     _id: int
     x: int | None = None
     y: int | None = None
@@ -139,8 +252,7 @@ class Drone(Registerable):
     target: tuple[int, int] | None = field(init=False, default=None)
     tg_coords: Any = field(init=False, default=None)
 
-    def __post_init__(self):
-        self.pos = self.x, self.y
+    history: deque[Sample] = field(init=False, repr=False, default_factory=partial(deque, maxlen=HISTORY_SIZE))
 
     def triangle(self):
         if not self.tg_coords:
@@ -157,7 +269,7 @@ class Drone(Registerable):
         if len(self.scans) >= 3:
             return Action.MOVE, 5000, 0, Light.OFF
 
-        return Action.MOVE, *self.target, Light.ON
+        return Action.MOVE, *self.target, self.light_for(self.target)
 
     def chase_all(self):
         _debug('---')
@@ -169,36 +281,391 @@ class Drone(Registerable):
         dir_cnt = Counter(d for c, d in self.radar.items() if not c.scanned)
         _debug(dir_cnt)
         dir = dir_cnt.most_common(1)[0][0]
-        
+
+        x, y = self.pos
         if 'R' in dir:
-            self.x += 600
+            x += 600
         elif 'L' in dir:
-            self.x -= 600
-        
+            x -= 600
+
         if 'T' in dir:
-            self.y -= 600
+            y -= 600
         elif 'B' in dir:
-            self.y += 600
+            y += 600
 
-        self.target = self.x, self.y
+        self.target = x, y
 
-        light = Light.ON if self.bat > 5 and self.y > 5000 else Light.OFF
-        return Action.MOVE, *self.target, light
+        return Action.MOVE, *self.target, self.light_for(self.target)
+
+    def allocated(self):
+        if len(self.scans) >= SCANS_PER_TRIP or not (creature := ALLOCATOR.assignment.get(self._id)):
+            self.dbg_msg = 'surfacing'
+            return Action.MOVE, self.x, 0, Light.OFF
+
+        self.target = creature.estimate()
+        self.dbg_msg = f'-> {creature._id}'
+        return Action.MOVE, *self.target, self.light_for(self.target)
+
+    def light_for(self, target):
+        path = travel_path(self.pos, target, LIGHT_HORIZON)
+        return plan_light(self, path)
+
+
+STRATEGIES = {
+    'triangle': Drone.triangle,
+    'chase_all': Drone.chase_all,
+    'allocated': Drone.allocated,
+}
+Drone.strategy = STRATEGIES[os.environ.get('SEABED_STRATEGY', 'allocated')]
 
-    strategy = triangle
+
+# ========== target allocation ==========
+
+REASSIGN_SHIFT = 800  # how far an estimate may drift before re-solving
+SCANS_PER_TRIP = 3
+
+
+def assign(costs):
+    """column picked for every row, minimizing the total cost
+
+    exact search over permutations, fine for our two drones
+    """
+    rows, cols = len(costs), len(costs[0]) if costs else 0
+    if rows > cols:
+        by_col = assign([list(col) for col in zip(*costs)])
+        picked = dict(zip(by_col, range(cols)))
+        return [picked.get(row) for row in range(rows)]
+    return list(min(
+        permutations(range(cols), rows),
+        key=lambda cols_: sum(costs[row][col] for row, col in enumerate(cols_)),
+    ))
+
+
+class Allocator:
+    """spreads the unscanned fish over our drones by travel time
+
+    the assignment is kept between turns and only re-solved when the
+    drones or targets change, or an estimate drifts by REASSIGN_SHIFT
+    """
+
+    def __init__(self):
+        self.assignment: dict[int, Creature] = {}
+        self.drones = ()
+        self.estimates: dict[Creature, tuple[int, int]] = {}
+        self.solves = 0
+
+    def stale(self, drones, estimates):
+        return (
+            self.drones != tuple(d._id for d in drones)
+            or self.estimates.keys() != estimates.keys()
+            or any(
+                hypot(x - self.estimates[c][0], y - self.estimates[c][1]) > REASSIGN_SHIFT
+                for c, (x, y) in estimates.items()
+            )
+        )
+
+    def update(self, drones, targets):
+        estimates = {c: c.estimate() for c in targets}
+        if not self.stale(drones, estimates):
+            return self.assignment
+
+        targets = list(estimates)
+        costs = [
+            [hypot(d.x - x, d.y - y) / DRONE_SPEED for x, y in estimates.values()]
+            for d in drones
+        ]
+        picks = assign(costs) if targets else [None] * len(drones)
+        self.assignment = {
+            d._id: targets[col]
+            for d, col in zip(drones, picks)
+            if col is not None
+        }
+        self.drones = tuple(d._id for d in drones)
+        self.estimates = estimates
+        self.solves += 1
+        return self.assignment
+
+
+ALLOCATOR = Allocator()
+
+
+# ========== map symmetry ==========
+
+def mirror_pairs(creatures):
+    """link creatures placed as mirror images across x=5000
+
+    twins have neighbouring ids (2k, 2k + 1) and share a type
+    """
+    by_id = {c._id: c for c in creatures}
+    pairs, singles = [], []
+    for c in sorted(creatures, key=lambda c: c._id):
+        twin = by_id.get(c._id ^ 1)
+        if twin is None or twin._type != c._type:
+            singles.append(c)
+        elif c._id < twin._id:
+            c.twin, twin.twin = twin, c
+            pairs.append((c, twin))
+    return pairs, singles
+
+
+STALE_SIGHTING = 10  # turns after which our own sighting is worth less than the twin's
+TWIN_PENALTY = 2  # extra age of a prior borrowed from the twin
+
+
+def _stale(seen):
+    return seen is None or seen > STALE_SIGHTING
+
+
+def _mirrored(pos):
+    x, y = pos
+    return 9999 - x, y
+
+
+def update_estimates():
+    """position guesses of every creature, one pass per mirrored pair
+
+    a creature not seen for STALE_SIGHTING turns borrows the mirrored
+    position of its twin when that one was seen more recently; the
+    borrowed prior counts as TWIN_PENALTY turns older, as the pair drifts
+    apart once a drone scares one of them
+    """
+    for a, b in PAIRS:
+        seen_a, seen_b = a.last_seen(TURN), b.last_seen(TURN)
+        prior_a = a.extrapolate(TURN) if seen_a is not None else None
+        prior_b = b.extrapolate(TURN) if seen_b is not None else None
+        age_a, age_b = seen_a, seen_b
+        if _stale(seen_a) and seen_b is not None and not seen_b > (seen_a or inf):
+            prior_a, age_a = _mirrored(prior_b), seen_b + TWIN_PENALTY
+        elif _stale(seen_b) and seen_a is not None and not seen_a > (seen_b or inf):
+            prior_b, age_b = _mirrored(prior_a), seen_a + TWIN_PENALTY
+        a.guess = a.locate(prior_a, age_a)
+        b.guess = b.locate(prior_b, age_b)
+
+    for c in SINGLES:
+        c.guess = c.locate(c.extrapolate(TURN) if c.history else None, c.last_seen(TURN))
+
+
+# ========== save timing ==========
+
+SURFACE_Y = 500
+DRONE_SPEED = 600
+SAVE_DELAY = 5  # turns we expect to keep scanning when not surfacing now
+
+TYPE_POINTS = {Type.SQUID: 1, Type.FISH: 2, Type.CRAB: 3}
+COLOR_BONUS = 3
+TYPE_BONUS = 4
+
+
+def turns_to_surface(y):
+    return max(0, -(-(y - SURFACE_Y) // DRONE_SPEED))
+
+
+def save_events(drones, delay=0):
+    """(turn, scanned ids) for every drone carrying scans, straight up"""
+    return tuple(sorted(
+        (turns_to_surface(d.y) + delay, frozenset(c._id for c in d.scans))
+        for d in drones
+        if d.scans and not d.emergency
+    ))
+
+
+@lru_cache(maxsize=None)
+def _bonus_groups():
+    fish = [c for c in Creature.register.values() if c._type != Type.MONSTER]
+    by_color = defaultdict(set)
+    by_type = defaultdict(set)
+    for c in fish:
+        by_color[c._color].add(c._id)
+        by_type[c._type].add(c._id)
+    return (
+        [(COLOR_BONUS, frozenset(ids)) for ids in by_color.values()]
+        + [(TYPE_BONUS, frozenset(ids)) for ids in by_type.values()]
+    )
+
+
+def _first_saves(events):
+    saves = {}
+    for turn, ids in events:
+        for _id in ids:
+            saves.setdefault(_id, turn)
+    return saves
+
+
+def _side_score(mine, theirs):
+    score = 0
+    for _id, turn in mine.items():
+        points = TYPE_POINTS[Creature.register[_id]._type]
+        score += points * 2 if turn <= theirs.get(_id, inf) else points
+
+    for bonus, ids in _bonus_groups():
+        if not ids <= mine.keys():
+            continue
+        done = max(mine[_id] for _id in ids)
+        foe_done = max(theirs.get(_id, inf) for _id in ids)
+        score += bonus * 2 if done <= foe_done else bonus
+    return score
+
+
+@lru_cache(maxsize=4096)
+def score_saves(my_events, foe_events):
+    """final (my, foe) score when both sides save as given by the events
+
+    saving a creature or completing a combo first (or in the same turn)
+    doubles its points
+    """
+    mine = _first_saves(sorted(my_events))
+    theirs = _first_saves(sorted(foe_events))
+    return _side_score(mine, theirs), _side_score(theirs, mine)
+
+
+def _race_events(my_saved, foe_saved, my_drones, foe_drones):
+    my_base = ((-1, frozenset(my_saved)),)
+    foe_events = ((-1, frozenset(foe_saved)),) + save_events(foe_drones)
+    now = my_base + save_events(my_drones)
+    later = my_base + save_events(my_drones, SAVE_DELAY)
+    return now, later, foe_events
+
+
+def save_delta(my_saved, foe_saved, my_drones, foe_drones):
+    """how much better (score difference) surfacing now is than later
+
+    a pure race-loss check: the later case carries the same scans, what
+    could still be scanned during SAVE_DELAY is not credited
+    """
+    now, later, foe_events = _race_events(my_saved, foe_saved, my_drones, foe_drones)
+    now, later = score_saves(now, foe_events), score_saves(later, foe_events)
+    return (now[0] - now[1]) - (later[0] - later[1])
+
+
+def contested_scans(my_saved, foe_saved, my_drones, foe_drones):
+    """ids we save first, alone or as part of a combo, only when surfacing now"""
+    now, later, foe_events = _race_events(my_saved, foe_saved, my_drones, foe_drones)
+    now, later = _first_saves(sorted(now)), _first_saves(sorted(later))
+    theirs = _first_saves(sorted(foe_events))
+
+    contested = {_id for _id, turn in now.items() if turn <= theirs.get(_id, inf) < later[_id]}
+    for _, ids in _bonus_groups():
+        if not ids <= now.keys():
+            continue
+        foe_done = max(theirs.get(_id, inf) for _id in ids)
+        if max(now[_id] for _id in ids) <= foe_done < max(later[_id] for _id in ids):
+            contested |= ids
+    return contested - set(my_saved)
+
+
+# ========== light scheduling ==========
+
+DARK_RADIUS = 800
+LIGHT_RADIUS = 2000
+LIGHT_COST = 5
+MAX_BATTERY = 30
+
+LIGHT_HORIZON = 6  # turns planned ahead
+MONSTER_RISK = 0.5  # scans a monster noticing us is worth
+BATTERY_VALUE = 0.05  # scans a unit of battery left at the horizon is worth
+FISH_DRIFT = 300  # how far (about) a fish wanders per turn since we saw it
+MONSTER_MEMORY = 3  # turns a monster sighting is trusted to block the light
+
+
+def travel_path(start, target, turns):
+    """positions after each of the next turns heading straight for target"""
+    (x, y), (tx, ty) = start, target
+    path = []
+    for _ in range(turns):
+        dist = hypot(tx - x, ty - y)
+        if dist <= DRONE_SPEED:
+            x, y = tx, ty
+        else:
+            x += (tx - x) * DRONE_SPEED / dist
+            y += (ty - y) * DRONE_SPEED / dist
+        path.append((x, y))
+    return path
+
+
+def uncertainty(c):
+    """rough spread (distance) of the creature's true position around its estimate"""
+    x_min, x_max, y_min, y_max = c.radar_box()
+    spread = hypot(x_max - x_min, y_max - y_min) / 4
+    if (age := c.last_seen(TURN)) is not None:
+        spread = min(spread, FISH_DRIFT * (age + 1))
+    return max(spread, 1)
+
+
+def _within(dist, radius, spread):
+    """chance the true distance is within radius, linear over +-spread"""
+    return min(1.0, max(0.0, (radius + spread - dist) / (2 * spread)))
+
+
+def light_gains(drone, path):
+    """expected new scans the light adds on each step of the path
+
+    every creature is credited once, on the first step it is likely inside
+    the light but outside the dark radius, weighted by how likely that is
+    """
+    gains = [0.0] * len(path)
+    for c in FISH:
+        if c.scanned or c in drone.scans or not c.on_radar():
+            continue
+        (cx, cy), spread = c.estimate(), uncertainty(c)
+        for step, (x, y) in enumerate(path):
+            dist = hypot(x - cx, y - cy)
+            if dist <= DARK_RADIUS:
+                break  # the dark radius gets it anyway
+            if dist <= LIGHT_RADIUS:
+                gains[step] += _within(dist, LIGHT_RADIUS, spread) - _within(dist, DARK_RADIUS, spread)
+                break
+    return gains
+
+
+def light_risks(path):
+    """monsters a light on each step of the path would wake up"""
+    monsters = [m for m in MONSTERS if (age := m.last_seen(TURN)) is not None and age <= MONSTER_MEMORY]
+    risks = []
+    for step, (x, y) in enumerate(path, start=1):
+        near = (hypot(x - mx, y - my) <= LIGHT_RADIUS for mx, my in (m.extrapolate(TURN + step) for m in monsters))
+        risks.append(sum(near))
+    return risks
+
+
+def plan_light(drone, path):
+    """light for this turn from a DP over (step, battery) along the path"""
+    gains = light_gains(drone, path)
+    risks = light_risks(path)
+
+    value = [b * BATTERY_VALUE for b in range(MAX_BATTERY + 1)]
+    choice = []
+    for gain, risk in zip(reversed(gains), reversed(risks)):
+        step_value, step_choice = [], []
+        for b in range(MAX_BATTERY + 1):
+            off = value[min(MAX_BATTERY, b + 1)]
+            on = gain - risk * MONSTER_RISK + value[b - LIGHT_COST] if b >= LIGHT_COST else -inf
+            step_value.append(max(on, off))
+            step_choice.append(Light.ON if on > off else Light.OFF)
+        value, choice = step_value, step_choice
+
+    return choice[min(drone.bat, MAX_BATTERY)]
 
 
 creature_count = int(input())
 ALL_CREATURES = {Creature.from_str(input()) for i in range(creature_count)}
 
+# static lookups, built while the first turn is generous
+FISH = [c for c in ALL_CREATURES if c._type != Type.MONSTER]
+MONSTERS = [c for c in ALL_CREATURES if c._type == Type.MONSTER]
+PAIRS, SINGLES = mirror_pairs(ALL_CREATURES)
+_bonus_groups()
+
 MY_SCORE = 0
 FOE_SCORE = 0
+TURN = -1
 
 
 def get_state():
-    global MY_SCORE, FOE_SCORE
+    global MY_SCORE, FOE_SCORE, TURN
     state = {}
 
+    TURN += 1
+
     MY_SCORE = int(input())
     FOE_SCORE = int(input())
 
@@ -241,29 +708,37 @@ def get_state():
     return state
 
 
-def update_objects_from_state(state):
-    my_drones = [
-        Drone(*drone_dict.values())
-        for drone_dict in state['my_drones']
-    ]
+def update_drone(drone_dict):
+    drone = Drone.get(drone_dict['_id'])
+    drone.observe(TURN, drone_dict['x'], drone_dict['y'])
+    drone.emergency = drone_dict['emergency']
+    drone.bat = drone_dict['bat']
+    # scans and radar are sent in full every turn
+    drone.scans.clear()
+    drone.radar.clear()
+    return drone
 
-    foe_drones = [
-        Drone(*drone_dict.values())
-        for drone_dict in state['foe_drones']
-    ]
+
+def update_objects_from_state(state):
+    my_drones = [update_drone(drone_dict) for drone_dict in state['my_drones']]
+    foe_drones = [update_drone(drone_dict) for drone_dict in state['foe_drones']]
 
     visible_creatures = []
     for creature_dict in state['visible_creatures']:
         c = Creature.register[creature_dict.pop('_id')]
-        c.__dict__.update(creature_dict)
+        c.observe(TURN, **creature_dict)
         visible_creatures.append(c)
 
-    # scans
+    # scans, only our own take a creature off the list
+    for c in ALL_CREATURES:
+        c.scanned = False
+    my_ids = {d._id for d in my_drones}
     for scan_dict in state['drone_scans']:
         drone = Drone.register[scan_dict['drone_id']]
         creature = Creature.register[scan_dict['creature_id']]
         drone.scans.add(creature)
-        creature.scanned = True
+        if drone._id in my_ids:
+            creature.scanned = True
 
     # radar blips
     for radar_blip_dict in state['radar_blips']:
@@ -276,6 +751,8 @@ def update_objects_from_state(state):
     for creature_id in state['my_scans']:
         Creature.register[creature_id].scanned = True
 
+    update_estimates()
+
     return my_drones, foe_drones, visible_creatures
 
 
@@ -289,12 +766,25 @@ while True:
         for scan in state['drone_scans']
         )
 
+    race = state['my_scans'], state['foe_scans'], my_drones, foe_drones
     if my_drone_scans_cnt >= 10:
-        # rush up
-        print(Action.MOVE, 5000, 0, 1)
-        print(Action.MOVE, 5000, 0, 1)
-        continue
+        saving = {d._id for d in my_drones}
+    elif save_delta(*race) > 0:
+        # only the drones carrying what we would lose the race for
+        contested = contested_scans(*race)
+        saving = {d._id for d in my_drones if any(c._id in contested for c in d.scans)}
+    else:
+        saving = set()
+
+    ALLOCATOR.update(
+        [d for d in my_drones if not d.emergency and len(d.scans) < SCANS_PER_TRIP and d._id not in saving],
+        [c for c in FISH if not c.scanned and c.on_radar()],
+    )
 
     for drone in my_drones:
         #_debug(drone.scans)
-        print(*drone.strategy(), f'{drone.dbg_msg} {drone.bat}')
+        if drone._id in saving:
+            # rush up
+            print(Action.MOVE, drone.x, 0, Light.OFF, 'saving')
+        else:
+            print(*drone.strategy(), f'{drone.dbg_msg} {drone.bat}')